@@ -1,7 +1,24 @@
+import os
+from contextlib import contextmanager
+from datetime import date, datetime
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; runs there are assumed single-process
+    fcntl = None
+
 import pandas as pd
 from nsepython import *
-from ta.momentum import RSIIndicator
-from ta.trend import SMAIndicator
+from indicators import SignalStream, jsonl_sink, print_sink
+from records import (
+    MOMENTUM_DTYPE,
+    PORTFOLIO_DTYPE,
+    QUOTE_DTYPE,
+    RecordBuffer,
+    advance_history,
+    load_history,
+    save_history,
+)
 
 # ==============================
 # LOAD FUNDAMENTALS (EXCEL)
@@ -41,13 +58,24 @@ fund_df["fund_score"] = (
 )
 
 fund_symbols = set(fund_df["symbol"])
+fund_scores = dict(zip(fund_df["symbol"], fund_df["fund_score"]))
 
 # ==============================
 # FETCH MARKET DATA
 # ==============================
 stocks = list(fund_symbols)  # faster: only scan fundamental stocks
+symbol_width = max((len(s) for s in stocks), default=1)
 
-data = []
+quotes = RecordBuffer(QUOTE_DTYPE, len(stocks), symbol_width)
+
+def quote_bar_date(q):
+    # Trading day from NSE's own timestamp ("17-Oct-2026 15:30:00"), so runs
+    # on weekends, holidays or before the open revise the last bar instead
+    # of inventing a new one.
+    try:
+        return datetime.strptime(q['metadata']['lastUpdateTime'], "%d-%b-%Y %H:%M:%S").date().isoformat()
+    except (KeyError, TypeError, ValueError):
+        return ""
 
 for symbol in stocks:
     try:
@@ -58,94 +86,152 @@ for symbol in stocks:
 
         pct_change = ((price - prev_close) / prev_close) * 100
 
-        data.append({
-            "symbol": symbol,
-            "price": price,
-            "pct_change": pct_change,
-            "volume": volume
-        })
+        quotes.append(
+            symbol=symbol,
+            price=price,
+            pct_change=pct_change,
+            volume=volume,
+            trade_date=quote_bar_date(q)
+        )
     except:
         continue
 
-df = pd.DataFrame(data)
-
 # ==============================
 # TOP GAINERS / LOSERS
 # ==============================
-top_gainers = df.sort_values(by="pct_change", ascending=False).head(50)
-top_losers = df.sort_values(by="pct_change").head(50)
+top_gainers = quotes.rank("pct_change", 50, ascending=False)
+top_losers = quotes.rank("pct_change", 50)
 
 # ==============================
 # MOMENTUM + FUNDAMENTAL SCAN
 # ==============================
-momentum_list = []
-
-for symbol in df["symbol"]:
-    try:
-        hist = equity_history(symbol, "6month")
-        hist_df = pd.DataFrame(hist)
-
-        hist_df['close'] = hist_df['CH_CLOSING_PRICE']
-        hist_df['volume'] = hist_df['CH_TOT_TRADED_QTY']
-
-        hist_df['rsi'] = RSIIndicator(hist_df['close'], window=14).rsi()
-        hist_df['sma50'] = SMAIndicator(hist_df['close'], window=50).sma_indicator()
-        hist_df['sma200'] = SMAIndicator(hist_df['close'], window=200).sma_indicator()
-        hist_df['avg_volume'] = hist_df['volume'].rolling(20).mean()
-
-        latest = hist_df.iloc[-1]
-        signal = "HOLD"
-
-        if (
-            latest['close'] > latest['sma50'] and
-            latest['sma50'] > latest['sma200'] and
-            55 <= latest['rsi'] <= 70
-        ):
-            signal = "BUY"
-
-        elif latest['rsi'] > 75 or latest['close'] < latest['sma50']:
-            signal = "SELL"
+STATE_FILE = "outputs/signal_state.pkl"
+STATE_LOCK = "outputs/signal_state.lock"
+HISTORY_FILE = "outputs/price_history.npz"
+# Gaps up to this many calendar days are weekends/holidays; a longer one
+# means missed sessions, so the symbol is re-seeded from history.
+RESEED_DAYS = 5
+
+def history_columns(hist):
+    # Plain NumPy columns straight off equity_history's frame; nothing
+    # per-symbol outlives the seed except the float64 closes.
+    if not isinstance(hist, pd.DataFrame):
+        hist = pd.DataFrame(hist)
+    # A missing close would poison every later rolling sum and SMA point,
+    # so gaps carry the previous close forward; leading gaps are dropped.
+    close_col = pd.to_numeric(hist['CH_CLOSING_PRICE'], errors="coerce").ffill()
+    keep = close_col.notna().to_numpy()
+    closes = close_col.to_numpy(dtype="f8")[keep]
+    volumes = pd.to_numeric(hist['CH_TOT_TRADED_QTY'], errors="coerce").fillna(0.0).to_numpy(dtype="f8")[keep]
+    dates = None
+    if 'CH_TIMESTAMP' in hist.columns:
+        # Same ISO format as quote_bar_date, so a quote can match its bar.
+        dates = pd.to_datetime(hist['CH_TIMESTAMP']).dt.strftime("%Y-%m-%d").to_numpy(dtype=str)[keep]
+    return closes, volumes, dates
+
+def history_key(closes, dates):
+    # Last bar date; without dates, bar count + last close, so a rolling
+    # window of constant length still changes the dashboard's cache key.
+    if dates is not None and len(dates):
+        return str(dates[-1])
+    return f"{len(closes)}:{closes[-1]:.4f}" if len(closes) else "0"
+
+def needs_seed(state, bar_date):
+    if state is None or state.last_date is None:
+        return True
+    if not bar_date:
+        return False
+    gap = date.fromisoformat(bar_date) - date.fromisoformat(state.last_date)
+    return gap.days > RESEED_DAYS
+
+@contextmanager
+def state_locked():
+    # gunicorn workers each import this module; they take turns on the
+    # persisted state so each transition is reported once.
+    os.makedirs("outputs", exist_ok=True)
+    with open(STATE_LOCK, "a") as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+momentum = RecordBuffer(MOMENTUM_DTYPE, len(quotes), symbol_width)
+
+# Alerts go to ALERTS_FILE (JSON lines), or stdout when it is set empty.
+alerts_file = os.getenv("ALERTS_FILE", "outputs/alerts.jsonl")
+alert_sinks = [jsonl_sink(alerts_file) if alerts_file else print_sink]
+
+with state_locked():
+    # Indicator state persists across runs: only symbols without usable
+    # state download history; every other symbol costs one O(1) update.
+    signal_stream = SignalStream.load(STATE_FILE, sinks=alert_sinks)
+
+    # symbol -> (float64 closes, last bar key), saved for the dashboard sparklines.
+    price_history = load_history(HISTORY_FILE) if os.path.exists(HISTORY_FILE) else {}
+
+    for symbol, price, volume, trade_date in zip(
+        quotes.column("symbol"),
+        quotes.column("price"),
+        quotes.column("volume"),
+        quotes.column("trade_date"),
+    ):
+        try:
+            symbol = str(symbol)
+            trade_date = str(trade_date)
+            state = signal_stream.states.get(symbol)
+
+            if needs_seed(state, trade_date):
+                # 1 year (~245 bars) so SMA200 is warm once seeding finishes.
+                closes, volumes, dates = history_columns(equity_history(symbol, "1year"))
+                state = signal_stream.seed(symbol, closes, volumes, dates)
+                price_history[symbol] = (closes, history_key(closes, dates))
+
+            if trade_date:
+                # Same trading day revises the last bar, a later one opens a
+                # new bar; only transitions reach the alert sink.
+                signal_stream.update(symbol, price, volume, trade_date)
+                advance_history(price_history, symbol, price, trade_date)
+
+            latest = state.snapshot()
+            signal = state.signal
 
             tech_score = latest['rsi'] + (latest['volume'] / latest['avg_volume'])
 
-            momentum_list.append({
-            "symbol": symbol,
-            "price": latest['close'],
-            "rsi": round(latest['rsi'], 2),
-            "tech_score": tech_score,
-            "signal": signal
-        })
-
-    except:
-        continue
-
-momentum_df = pd.DataFrame(momentum_list)
-
-momentum_df = momentum_df.merge(
-    fund_df[["symbol", "fund_score"]],
-    on="symbol",
-    how="left"
-)
-
-momentum_df["final_score"] = (
-    momentum_df["tech_score"] * 0.6 +
-    momentum_df["fund_score"] * 0.4
+            momentum.append(
+                symbol=symbol,
+                price=latest['close'],
+                rsi=round(latest['rsi'], 2),
+                tech_score=tech_score,
+                signal=signal,
+                fund_score=fund_scores.get(symbol, float("nan"))
+            )
+
+        except:
+            continue
+
+    signal_stream.save(STATE_FILE)
+    save_history(HISTORY_FILE, price_history)
+
+# Scored in place on the column views; no merge or intermediate frame.
+momentum.column("final_score")[:] = (
+    momentum.column("tech_score") * 0.6 +
+    momentum.column("fund_score") * 0.4
 )
 
-momentum_df = momentum_df.sort_values(by="final_score", ascending=False).head(50)
+top_momentum = momentum.rank("final_score", 50, ascending=False)
 
 # ==============================
 # PORTFOLIO TRACKING
 # ==============================
 portfolio = pd.read_excel("portfolio.xlsx")
 
-portfolio_data = []
-
-for _, row in portfolio.iterrows():
-    symbol = row["symbol"]
-    entry = row["entry_price"]
-    qty = row["quantity"]
+holdings = RecordBuffer(
+    PORTFOLIO_DTYPE,
+    len(portfolio),
+    max((len(str(s)) for s in portfolio["symbol"]), default=1),
+)
+holding_bars = []
 
+for symbol, entry, qty in zip(portfolio["symbol"], portfolio["entry_price"], portfolio["quantity"]):
     try:
         q = nse_eq_quote(symbol)
         current = q['priceInfo']['lastPrice']
@@ -153,22 +239,36 @@ for _, row in portfolio.iterrows():
         pnl = (current - entry) * qty
         pnl_pct = ((current - entry) / entry) * 100
 
-        portfolio_data.append({
-            "symbol": symbol,
-            "entry": entry,
-            "current": current,
-            "pnl": pnl,
-            "pnl_pct": pnl_pct
-        })
+        holdings.append(
+            symbol=symbol,
+            entry=entry,
+            current=current,
+            pnl=pnl,
+            pnl_pct=pnl_pct
+        )
+        holding_bars.append((symbol, current, quote_bar_date(q)))
     except:
         continue
 
-portfolio_df = pd.DataFrame(portfolio_data)
+# Re-read the store under the lock: another worker may have saved since.
+with state_locked():
+    price_history = load_history(HISTORY_FILE) if os.path.exists(HISTORY_FILE) else {}
+    for symbol, current, bar_date in holding_bars:
+        if advance_history(price_history, symbol, current, bar_date):
+            continue
+        try:
+            closes, _, dates = history_columns(equity_history(symbol, "1year"))
+            price_history[symbol] = (closes, history_key(closes, dates))
+            advance_history(price_history, symbol, current, bar_date)
+        except:
+            pass
+    save_history(HISTORY_FILE, price_history)
 
 # ==============================
 # SAVE OUTPUTS (EXCEL)
 # ==============================
-top_gainers.to_excel("outputs/top_gainers.xlsx", index=False)
-top_losers.to_excel("outputs/top_losers.xlsx", index=False)
-momentum_df.to_excel("outputs/potential_stocks.xlsx", index=False)
-portfolio_df.to_excel("outputs/portfolio_performance.xlsx", index=False)
\ No newline at end of file
+# Only the rows that are written get materialised as DataFrames.
+quotes.to_frame(top_gainers).to_excel("outputs/top_gainers.xlsx", index=False)
+quotes.to_frame(top_losers).to_excel("outputs/top_losers.xlsx", index=False)
+momentum.to_frame(top_momentum).to_excel("outputs/potential_stocks.xlsx", index=False)
+holdings.to_frame().to_excel("outputs/portfolio_performance.xlsx", index=False)
\ No newline at end of file
@@ -5,6 +5,7 @@ import importlib
 import re
 import os
 import html as html_lib
+from sparklines import load_history_cached, sparklines_for
 
 app = Flask(__name__)
 
@@ -94,6 +95,11 @@ tr:nth-child(odd) td { background:#0a152baa; }
 .bar-neg { background:#ef4444; }
 .bar-neutral { background:#38bdf8; }
 .chart-value { width:95px; text-align:left; font-size:12px; color:#e2e8f0; }
+.spark { display:block; margin:0 auto; }
+.spark polyline { fill:none; stroke-linejoin:round; stroke-linecap:round; }
+.spark-close { stroke:var(--accent); stroke-width:1.5; }
+.spark-sma50 { stroke:var(--warn); stroke-width:1; }
+.spark-sma200 { stroke:var(--muted); stroke-width:1; stroke-dasharray:2 2; }
 @media (max-width: 980px) {
     .cards { grid-template-columns:repeat(2, minmax(0,1fr)); }
 }
@@ -169,6 +175,7 @@ OUTPUT_FILES = {
     "momentum": OUTPUT_DIR / "potential_stocks.xlsx",
     "portfolio": OUTPUT_DIR / "portfolio_performance.xlsx",
 }
+HISTORY_FILE = OUTPUT_DIR / "price_history.npz"
 
 
 def _first_present(columns: list[str], candidates: list[str]) -> str | None:
@@ -199,7 +206,9 @@ def _outputs_exist() -> bool:
 
 
 def _add_signal_column(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
+    # Adds the column in place: callers own freshly loaded frames, so a
+    # defensive copy only doubles peak memory.
+    out = df
     if "signal" in out.columns:
         out["signal"] = out["signal"].astype(str).str.upper()
         return out
@@ -229,6 +238,14 @@ def _add_signal_column(df: pd.DataFrame) -> pd.DataFrame:
     return out
 
 
+def _add_trend_column(df: pd.DataFrame, sparks: dict[str, str]) -> pd.DataFrame:
+    if not sparks or "symbol" not in df.columns:
+        return df
+    trend = df["symbol"].astype(str).map(sparks).fillna("-")
+    df.insert(min(1, len(df.columns)), "trend", trend)
+    return df
+
+
 def _build_bar_chart(df: pd.DataFrame, label_col: str, value_col: str, signed: bool = False, max_rows: int = 12) -> str:
     if label_col not in df.columns or value_col not in df.columns or df.empty:
         return "<p>No data available for chart.</p>"
@@ -295,7 +312,7 @@ def _generate_offline_outputs() -> tuple[bool, str]:
         gainers = work.sort_values("score", ascending=False).head(50).rename(columns={"score": "pct_change_est"})
         losers = work.sort_values("score", ascending=True).head(50).rename(columns={"score": "pct_change_est"})
 
-        momentum = work.copy()
+        momentum = work
         momentum["tech_score"] = (
             momentum["roe"] * 0.4
             + momentum["sales_growth"] * 0.3
@@ -433,7 +450,7 @@ def dashboard():
     )
 
     # Portfolio styling + hold/review suggestion.
-    portfolio_fmt = portfolio_df.copy()
+    portfolio_fmt = portfolio_df
     portfolio_fmt["pnl"] = pd.to_numeric(portfolio_fmt.get("pnl", 0), errors="coerce").fillna(0.0)
     portfolio_fmt["pnl_pct"] = pd.to_numeric(portfolio_fmt.get("pnl_pct", 0), errors="coerce").fillna(0.0)
 
@@ -465,8 +482,7 @@ def dashboard():
     )
     portfolio_chart = _build_bar_chart(merged_for_signal, "symbol", "pnl", signed=True)
 
-    common_numeric = common_df.copy()
-    common_chart = _build_bar_chart(common_numeric, "symbol", "fund_score", signed=False)
+    common_chart = _build_bar_chart(common_df, "symbol", "fund_score", signed=False)
 
     merged_for_signal["pnl"] = merged_for_signal["pnl"].apply(
         lambda x: f'<span class="positive">{round(x, 2)}</span>' if x >= 0 else f'<span class="negative">{round(x, 2)}</span>'
@@ -500,6 +516,21 @@ def dashboard():
     else:
         common_df = pd.DataFrame([{"symbol": "No common stocks found", "suggestion": "-"}])
 
+    # Sparklines are built in one batch and cached per (symbol, last bar date).
+    # Offline tables skip them: a history file left by an earlier live run
+    # would not describe the rows shown.
+    history = load_history_cached(HISTORY_FILE) if refresh_ok else {}
+    if history:
+        symbols = pd.concat([
+            gainers_df.get("symbol", pd.Series(dtype=str)),
+            momentum_df.get("symbol", pd.Series(dtype=str)),
+            merged_for_signal.get("symbol", pd.Series(dtype=str)),
+        ])
+        sparks = sparklines_for(symbols, history)
+        gainers_df = _add_trend_column(gainers_df, sparks)
+        momentum_df = _add_trend_column(momentum_df, sparks)
+        merged_for_signal = _add_trend_column(merged_for_signal, sparks)
+
     gainers = gainers_df.to_html(index=False, escape=False)
     losers = losers_df.to_html(index=False, escape=False)
     momentum = momentum_df.to_html(index=False, escape=False)
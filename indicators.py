@@ -0,0 +1,307 @@
+import json
+import logging
+import os
+import pickle
+from array import array
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+NAN = float("nan")
+
+RSI_WINDOW = 14
+SMA_FAST = 50
+SMA_SLOW = 200
+VOLUME_WINDOW = 20
+# Bump when IndicatorState's layout changes; older saved state is re-seeded.
+STATE_VERSION = 2
+
+
+# ==============================
+# SIGNAL RULE
+# ==============================
+def classify_signal(close: float, rsi: float, sma50: float, sma200: float) -> str:
+    # NaN (not enough bars yet) fails every comparison, same as the pandas rule.
+    if close > sma50 and sma50 > sma200 and 55 <= rsi <= 70:
+        return "BUY"
+    if rsi > 75 or close < sma50:
+        return "SELL"
+    return "HOLD"
+
+
+# ==============================
+# PER-SYMBOL INCREMENTAL STATE
+# ==============================
+class _RollingMean:
+    # Preallocated ring of raw doubles: O(1) per push, and a universe of
+    # states pickles as flat buffers instead of ~1M boxed floats.
+    __slots__ = ("window", "values", "filled", "head", "total")
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = array("d", bytes(8 * window))
+        self.filled = 0
+        self.head = 0
+        self.total = 0.0
+
+    def push(self, value: float) -> None:
+        if self.filled == self.window:
+            self.total -= self.values[self.head]
+        else:
+            self.filled += 1
+        self.values[self.head] = value
+        self.total += value
+        self.head = (self.head + 1) % self.window
+
+    def replace_last(self, value: float) -> None:
+        last = (self.head - 1) % self.window
+        self.total += value - self.values[last]
+        self.values[last] = value
+
+    @property
+    def mean(self) -> float:
+        if self.filled < self.window:
+            return NAN
+        return self.total / self.window
+
+
+class IndicatorState:
+    # Mirrors ta's RSIIndicator / SMAIndicator and pandas rolling(20).mean(),
+    # but each bar or intraday revision is O(1).
+    __slots__ = (
+        "last_date", "close", "volume", "count",
+        "base_close", "base_gain", "base_loss", "avg_gain", "avg_loss",
+        "sma50_window", "sma200_window", "volume_window",
+    )
+
+    def __init__(self):
+        self.last_date = None
+        self.close = NAN
+        self.volume = NAN
+        self.count = 0
+        # Close and Wilder averages as of the previous bar, so the current
+        # bar can be revised by later ticks without replaying history.
+        self.base_close = None
+        self.base_gain = 0.0
+        self.base_loss = 0.0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.sma50_window = _RollingMean(SMA_FAST)
+        self.sma200_window = _RollingMean(SMA_SLOW)
+        self.volume_window = _RollingMean(VOLUME_WINDOW)
+
+    def _apply_rsi(self, close: float) -> None:
+        if self.base_close is None:
+            self.avg_gain = 0.0
+            self.avg_loss = 0.0
+            return
+        diff = close - self.base_close
+        gain = diff if diff > 0 else 0.0
+        loss = -diff if diff < 0 else 0.0
+        self.avg_gain = self.base_gain + (gain - self.base_gain) / RSI_WINDOW
+        self.avg_loss = self.base_loss + (loss - self.base_loss) / RSI_WINDOW
+
+    def push_bar(self, close: float, volume: float, date=None) -> None:
+        if self.count > 0:
+            self.base_close = self.close
+            self.base_gain = self.avg_gain
+            self.base_loss = self.avg_loss
+        self._apply_rsi(close)
+        self.sma50_window.push(close)
+        self.sma200_window.push(close)
+        self.volume_window.push(volume)
+        self.close = close
+        self.volume = volume
+        self.last_date = date
+        self.count += 1
+
+    def revise_bar(self, close: float, volume: float) -> None:
+        if self.count == 0:
+            self.push_bar(close, volume)
+            return
+        self._apply_rsi(close)
+        self.sma50_window.replace_last(close)
+        self.sma200_window.replace_last(close)
+        self.volume_window.replace_last(volume)
+        self.close = close
+        self.volume = volume
+
+    def update(self, close: float, volume: float, date) -> bool:
+        # A tick dated like the last bar revises it (intraday quote, with the
+        # day's cumulative volume); a later date opens a new bar; an earlier
+        # one is stale and ignored. Returns whether the state changed. The
+        # date is required so an undated quote never overwrites a closed bar.
+        if date is None:
+            raise ValueError("update() needs the bar date of the quote")
+        if self.count > 0 and self.last_date is not None:
+            if date < self.last_date:
+                return False
+            if date == self.last_date:
+                self.revise_bar(close, volume)
+                return True
+        self.push_bar(close, volume, date)
+        return True
+
+    @property
+    def rsi(self) -> float:
+        if self.count < RSI_WINDOW:
+            return NAN
+        if self.avg_loss == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + self.avg_gain / self.avg_loss)
+
+    @property
+    def sma50(self) -> float:
+        return self.sma50_window.mean
+
+    @property
+    def sma200(self) -> float:
+        return self.sma200_window.mean
+
+    @property
+    def avg_volume(self) -> float:
+        return self.volume_window.mean
+
+    @property
+    def signal(self) -> str:
+        return classify_signal(self.close, self.rsi, self.sma50, self.sma200)
+
+    def snapshot(self) -> dict:
+        return {
+            "close": self.close,
+            "volume": self.volume,
+            "rsi": self.rsi,
+            "sma50": self.sma50,
+            "sma200": self.sma200,
+            "avg_volume": self.avg_volume,
+        }
+
+
+# ==============================
+# STREAM + TRANSITION ALERTS
+# ==============================
+AlertSink = Callable[[dict], None]
+
+
+def print_sink(alert: dict) -> None:
+    print(f"[{alert['symbol']}] {alert['event']}: {alert['detail']} @ {alert['close']}")
+
+
+def jsonl_sink(path) -> AlertSink:
+    def write(alert: dict) -> None:
+        with open(path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(alert, default=str) + "\n")
+    return write
+
+
+class SignalStream:
+    # `signals` and `above_sma50` hold the last state alerts were compared
+    # against; they are persisted with the indicator state so a restarted
+    # process does not re-send a transition it already reported.
+    def __init__(self, sinks: list[AlertSink] | None = None):
+        self.states: dict[str, IndicatorState] = {}
+        self.signals: dict[str, str] = {}
+        self.above_sma50: dict[str, bool | None] = {}
+        self.sinks: list[AlertSink] = list(sinks or [])
+
+    @classmethod
+    def load(cls, path, sinks: list[AlertSink] | None = None) -> "SignalStream":
+        stream = cls(sinks)
+        try:
+            with open(path, "rb") as fh:
+                saved = pickle.load(fh)
+        except FileNotFoundError:
+            return stream
+        except Exception:
+            logger.exception("discarding unreadable signal state %s", path)
+            return stream
+        if not isinstance(saved, dict) or saved.get("version") != STATE_VERSION:
+            return stream
+        stream.states = saved["states"]
+        stream.signals = saved["signals"]
+        stream.above_sma50 = saved["above_sma50"]
+        return stream
+
+    def save(self, path) -> None:
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as fh:
+            pickle.dump(
+                {
+                    "version": STATE_VERSION,
+                    "states": self.states,
+                    "signals": self.signals,
+                    "above_sma50": self.above_sma50,
+                },
+                fh,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp, path)
+
+    def add_sink(self, sink: AlertSink) -> None:
+        self.sinks.append(sink)
+
+    def _state(self, symbol: str) -> IndicatorState:
+        state = self.states.get(symbol)
+        if state is None:
+            state = IndicatorState()
+            self.states[symbol] = state
+        return state
+
+    @staticmethod
+    def _position(state: IndicatorState) -> bool | None:
+        sma50 = state.sma50
+        if sma50 != sma50:
+            return None
+        return state.close > sma50
+
+    def seed(self, symbol: str, closes, volumes, dates=None) -> IndicatorState:
+        # Replays stored history once; no alerts are emitted while seeding.
+        state = IndicatorState()
+        if dates is None:
+            dates = [None] * len(closes)
+        for close, volume, date in zip(closes, volumes, dates):
+            state.push_bar(float(close), float(volume), date)
+        self.states[symbol] = state
+        self.signals[symbol] = state.signal
+        self.above_sma50[symbol] = self._position(state)
+        return state
+
+    def update(self, symbol: str, close: float, volume: float, date) -> list[dict]:
+        state = self._state(symbol)
+        if not state.update(float(close), float(volume), date):
+            return []
+
+        alerts = []
+        signal = state.signal
+        previous = self.signals.get(symbol)
+        if previous is not None and signal != previous:
+            alerts.append(self._alert(symbol, state, "signal", f"{previous}->{signal}"))
+        self.signals[symbol] = signal
+
+        position = self._position(state)
+        was_above = self.above_sma50.get(symbol)
+        if was_above is not None and position is not None and position != was_above:
+            detail = "close crossed above SMA50" if position else "close crossed below SMA50"
+            alerts.append(self._alert(symbol, state, "sma50_cross", detail))
+        self.above_sma50[symbol] = position
+
+        # A failing sink must not cost the caller its scan result.
+        for alert in alerts:
+            for sink in self.sinks:
+                try:
+                    sink(alert)
+                except Exception:
+                    logger.exception("alert sink %r failed for %s", sink, symbol)
+        return alerts
+
+    @staticmethod
+    def _alert(symbol: str, state: IndicatorState, event: str, detail: str) -> dict:
+        return {
+            "symbol": symbol,
+            "event": event,
+            "detail": detail,
+            "date": state.last_date,
+            "close": state.close,
+            "rsi": state.rsi,
+            "signal": state.signal,
+        }
@@ -0,0 +1,157 @@
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# ==============================
+# RECORD LAYOUTS
+# ==============================
+QUOTE_DTYPE = np.dtype([
+    ("symbol", "U20"),
+    ("price", "f8"),
+    ("pct_change", "f8"),
+    ("volume", "f8"),
+    ("trade_date", "U10"),
+])
+
+MOMENTUM_DTYPE = np.dtype([
+    ("symbol", "U20"),
+    ("price", "f8"),
+    ("rsi", "f8"),
+    ("tech_score", "f8"),
+    ("signal", "U4"),
+    ("fund_score", "f8"),
+    ("final_score", "f8"),
+])
+
+PORTFOLIO_DTYPE = np.dtype([
+    ("symbol", "U20"),
+    ("entry", "f8"),
+    ("current", "f8"),
+    ("pnl", "f8"),
+    ("pnl_pct", "f8"),
+])
+
+
+# ==============================
+# COLUMNAR BUFFER
+# ==============================
+class RecordBuffer:
+    # Preallocated structured array that fetchers append into row by row.
+    # Scoring and ranking work on column views; only the rows that are
+    # written out get materialised as a DataFrame.
+    __slots__ = ("data", "size", "text_widths")
+
+    def __init__(self, dtype: np.dtype, capacity: int, symbol_width: int | None = None):
+        dtype = np.dtype(dtype)
+        if symbol_width is not None:
+            # Widen (never narrow) the symbol field to fit the universe.
+            width = max(symbol_width, dtype["symbol"].itemsize // 4)
+            dtype = np.dtype([
+                (name, f"U{width}" if name == "symbol" else dtype[name])
+                for name in dtype.names
+            ])
+        self.data = np.zeros(max(int(capacity), 1), dtype=dtype)
+        self.size = 0
+        self.text_widths = {
+            name: dtype[name].itemsize // 4 for name in dtype.names if dtype[name].kind == "U"
+        }
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, **fields) -> None:
+        if self.size == len(self.data):
+            grown = np.zeros(len(self.data) * 2, dtype=self.data.dtype)
+            grown[: self.size] = self.data
+            self.data = grown
+        # NumPy silently truncates text that overflows a U field; a cut
+        # symbol would then miss every later lookup, so refuse it instead.
+        for name, width in self.text_widths.items():
+            if name in fields and len(str(fields[name])) > width:
+                raise ValueError(f"{name} {fields[name]!r} is longer than {width} characters")
+        row = self.data[self.size]
+        for name, value in fields.items():
+            row[name] = value
+        self.size += 1
+
+    def view(self) -> np.ndarray:
+        return self.data[: self.size]
+
+    def column(self, name: str) -> np.ndarray:
+        return self.data[name][: self.size]
+
+    def rank(self, name: str, n: int | None = None, ascending: bool = True) -> np.ndarray:
+        # NaN sorts last either way, like DataFrame.sort_values.
+        values = self.column(name)
+        order = np.argsort(values if ascending else -values, kind="stable")
+        return order if n is None else order[:n]
+
+    def to_frame(self, rows: np.ndarray | None = None) -> pd.DataFrame:
+        records = self.view() if rows is None else self.view()[rows]
+        return pd.DataFrame(records)
+
+
+# ==============================
+# STORED PRICE HISTORY
+# ==============================
+def save_history(path, history: dict[str, tuple[np.ndarray, str]]) -> None:
+    # All closes go into one flat array; offsets[i]:offsets[i + 1] is symbol i.
+    closes = [np.asarray(c, dtype="f8") for c, _ in history.values()]
+    lengths = np.array([len(c) for c in closes], dtype=np.int64)
+    # Written beside the target and swapped in, so readers never see half a file.
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as fh:
+        np.savez(
+            fh,
+            symbols=np.array([str(s) for s in history], dtype=str),
+            offsets=np.concatenate(([0], np.cumsum(lengths))),
+            closes=np.concatenate(closes) if closes else np.empty(0, dtype="f8"),
+            last_dates=np.array([str(d) for _, d in history.values()], dtype=str),
+        )
+    os.replace(tmp, path)
+
+
+HISTORY_BARS = 260
+
+
+def _is_iso_date(value: str) -> bool:
+    try:
+        date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def advance_history(history: dict[str, tuple[np.ndarray, str]], symbol: str, close: float, bar_date: str) -> bool:
+    # Applies one quote to stored closes the way IndicatorState.update does:
+    # same date revises the last close, a later one appends, older is ignored.
+    # False means there is nothing dated to advance and history must be fetched.
+    stored = history.get(symbol)
+    if stored is None or not _is_iso_date(stored[1]):
+        return False
+    if not _is_iso_date(bar_date):
+        return True
+    closes, last_date = stored
+    if bar_date == last_date:
+        closes = closes.copy()
+        closes[-1] = close
+    elif bar_date > last_date:
+        closes = np.append(closes, close)[-HISTORY_BARS:]
+    else:
+        return True
+    history[symbol] = (closes, bar_date)
+    return True
+
+
+def load_history(path) -> dict[str, tuple[np.ndarray, str]]:
+    with np.load(path) as stored:
+        symbols = stored["symbols"]
+        offsets = stored["offsets"]
+        closes = stored["closes"]
+        last_dates = stored["last_dates"]
+    return {
+        str(symbol): (closes[offsets[i]:offsets[i + 1]], str(last_dates[i]))
+        for i, symbol in enumerate(symbols)
+    }
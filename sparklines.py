@@ -0,0 +1,100 @@
+import html as html_lib
+from pathlib import Path
+
+import numpy as np
+
+from records import load_history
+
+SPARK_WIDTH = 120
+SPARK_HEIGHT = 32
+SPARK_POINTS = 48
+
+# Stored history is reloaded only when the file changes on disk.
+_history_cache: dict = {"key": None, "history": {}}
+# symbol -> (last bar date, svg); a new bar date replaces the old entry.
+_spark_cache: dict[str, tuple[str, str]] = {}
+
+
+def load_history_cached(path: Path) -> dict[str, tuple[np.ndarray, str]]:
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return {}
+    key = (str(path), stat.st_mtime_ns)
+    if _history_cache["key"] != key:
+        try:
+            _history_cache["history"] = load_history(path)
+        except Exception:
+            _history_cache["history"] = {}
+        _history_cache["key"] = key
+    return _history_cache["history"]
+
+
+def _sma(closes: np.ndarray, window: int) -> np.ndarray:
+    # Cumsum over NaN-zeroed values plus a running count of valid ones: a
+    # NaN only blanks the windows that contain it, not everything after.
+    out = np.full(len(closes), np.nan)
+    if len(closes) >= window:
+        valid = ~np.isnan(closes)
+        csum = np.cumsum(np.insert(np.where(valid, closes, 0.0), 0, 0.0))
+        count = np.cumsum(np.insert(valid, 0, False))
+        sums = csum[window:] - csum[:-window]
+        full = (count[window:] - count[:-window]) == window
+        out[window - 1:] = np.where(full, sums / window, np.nan)
+    return out
+
+
+def _downsample_index(n: int, points: int) -> np.ndarray:
+    if n <= points:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, points).round().astype(np.int64))
+
+
+def _polyline(xs: np.ndarray, ys: np.ndarray, klass: str) -> str:
+    valid = ~np.isnan(ys)
+    if valid.sum() < 2:
+        return ""
+    coords = " ".join(f"{x:.1f},{y:.1f}" for x, y in zip(xs[valid], ys[valid]))
+    return f"<polyline class='{klass}' points='{coords}'/>"
+
+
+def _render_sparkline(symbol: str, closes: np.ndarray) -> str:
+    n = len(closes)
+    if n < 2:
+        return "-"
+
+    # Indicators are computed on the full series, then all three lines are
+    # sampled at the same points.
+    idx = _downsample_index(n, SPARK_POINTS)
+    series = np.vstack([closes, _sma(closes, 50), _sma(closes, 200)])[:, idx]
+
+    lo = float(np.nanmin(series))
+    hi = float(np.nanmax(series))
+    span = (hi - lo) or 1.0
+    xs = idx / (n - 1) * (SPARK_WIDTH - 2) + 1
+    ys = (SPARK_HEIGHT - 2) - (series - lo) / span * (SPARK_HEIGHT - 2) + 1
+
+    title = html_lib.escape(f"{symbol}: close {closes[-1]:.2f}")
+    return (
+        f"<svg class='spark' width='{SPARK_WIDTH}' height='{SPARK_HEIGHT}' "
+        f"viewBox='0 0 {SPARK_WIDTH} {SPARK_HEIGHT}'><title>{title}</title>"
+        + _polyline(xs, ys[2], "spark-sma200")
+        + _polyline(xs, ys[1], "spark-sma50")
+        + _polyline(xs, ys[0], "spark-close")
+        + "</svg>"
+    )
+
+
+def sparklines_for(symbols, history: dict[str, tuple[np.ndarray, str]]) -> dict[str, str]:
+    out = {}
+    for symbol in set(str(s) for s in symbols):
+        stored = history.get(symbol)
+        if stored is None:
+            continue
+        closes, last_date = stored
+        cached = _spark_cache.get(symbol)
+        if cached is None or cached[0] != last_date:
+            cached = (last_date, _render_sparkline(symbol, closes))
+            _spark_cache[symbol] = cached
+        out[symbol] = cached[1]
+    return out
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import RSI_WINDOW, IndicatorState, SignalStream
+
+
+def _series(n: int = 300, seed: int = 7) -> tuple[pd.Series, pd.Series]:
+    rng = np.random.default_rng(seed)
+    closes = pd.Series(100 * np.cumprod(1 + rng.normal(0, 0.02, n)))
+    volumes = pd.Series(rng.integers(1_000, 50_000, n).astype(float))
+    return closes, volumes
+
+
+def _reference(closes: pd.Series, volumes: pd.Series) -> pd.DataFrame:
+    # Same definitions as ta's RSIIndicator / SMAIndicator.
+    diff = closes.diff()
+    up = diff.where(diff > 0, 0.0)
+    down = -diff.where(diff < 0, 0.0)
+    avg_up = up.ewm(alpha=1 / RSI_WINDOW, min_periods=RSI_WINDOW, adjust=False).mean()
+    avg_down = down.ewm(alpha=1 / RSI_WINDOW, min_periods=RSI_WINDOW, adjust=False).mean()
+    rsi = pd.Series(np.where(avg_down == 0, 100.0, 100 - 100 / (1 + avg_up / avg_down)))
+    rsi[avg_up.isna()] = np.nan
+    return pd.DataFrame({
+        "rsi": rsi,
+        "sma50": closes.rolling(50).mean(),
+        "sma200": closes.rolling(200).mean(),
+        "avg_volume": volumes.rolling(20).mean(),
+    })
+
+
+def _assert_matches(state: IndicatorState, expected: pd.Series) -> None:
+    for name in ["rsi", "sma50", "sma200", "avg_volume"]:
+        got = getattr(state, name)
+        want = expected[name]
+        if np.isnan(want):
+            assert np.isnan(got), name
+        else:
+            assert got == pytest.approx(want, rel=1e-9), name
+
+
+def test_matches_pandas_definitions_including_warm_up():
+    closes, volumes = _series()
+    expected = _reference(closes, volumes)
+    state = IndicatorState()
+    for i, (close, volume) in enumerate(zip(closes, volumes)):
+        state.push_bar(close, volume, i)
+        _assert_matches(state, expected.iloc[i])
+
+
+def test_revise_bar_round_trip():
+    closes, volumes = _series()
+    expected = _reference(closes, volumes)
+    state = IndicatorState()
+    for i, (close, volume) in enumerate(zip(closes, volumes)):
+        # Intraday ticks for bar i, then the final close replaces them.
+        state.update(close * 0.97, volume / 3, i)
+        state.update(close * 1.02, volume / 2, i)
+        state.update(close, volume, i)
+    _assert_matches(state, expected.iloc[-1])
+
+
+def test_update_requires_date():
+    state = IndicatorState()
+    state.push_bar(100.0, 1_000.0, 0)
+    with pytest.raises(ValueError):
+        state.update(101.0, 1_000.0, None)
+
+
+def test_stream_alerts_only_on_transition():
+    closes = np.linspace(100, 200, 250)
+    alerts = []
+    stream = SignalStream(sinks=[alerts.append])
+    stream.seed("X", closes, np.full(250, 1_000.0), list(range(250)))
+    assert alerts == []
+
+    stream.update("X", 50.0, 1_000.0, 250)
+    assert [(a["event"], a["detail"]) for a in alerts] == [
+        ("sma50_cross", "close crossed below SMA50"),
+    ]
+
+    stream.update("X", 49.0, 1_000.0, 250)
+    assert len(alerts) == 1
+
+
+def test_update_ignores_ticks_older_than_last_bar():
+    closes, volumes = _series()
+    state = IndicatorState()
+    for i, (close, volume) in enumerate(zip(closes, volumes)):
+        state.push_bar(close, volume, i)
+    before = state.snapshot()
+
+    assert state.update(1.0, 1.0, len(closes) - 2) is False
+    assert state.count == len(closes)
+    assert state.snapshot() == before
+
+
+def test_failing_sink_does_not_break_update():
+    def broken(alert):
+        raise OSError("outputs/ is read-only")
+
+    alerts = []
+    stream = SignalStream(sinks=[broken, alerts.append])
+    stream.seed("X", np.linspace(100, 200, 250), np.full(250, 1_000.0), list(range(250)))
+
+    emitted = stream.update("X", 50.0, 1_000.0, 250)
+    assert len(emitted) == 1
+    assert alerts == emitted
+
+
+def test_saved_stream_does_not_resend_transitions(tmp_path):
+    path = tmp_path / "signal_state.pkl"
+    first = []
+    stream = SignalStream(sinks=[first.append])
+    stream.seed("X", np.linspace(100, 200, 250), np.full(250, 1_000.0), list(range(250)))
+    stream.update("X", 50.0, 1_000.0, 250)
+    stream.save(path)
+    assert len(first) == 1
+
+    again = []
+    restored = SignalStream.load(path, sinks=[again.append])
+    restored.update("X", 50.0, 1_000.0, 250)
+    assert again == []
+    assert restored.states["X"].count == 251
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from records import QUOTE_DTYPE, RecordBuffer, load_history, save_history
+
+
+def test_append_rejects_symbol_wider_than_field():
+    quotes = RecordBuffer(QUOTE_DTYPE, 1)
+    with pytest.raises(ValueError):
+        quotes.append(symbol="BAJAJ-AUTO-VERYLONGSYMBOLNAME", price=1.0)
+    assert len(quotes) == 0
+
+
+def test_symbol_width_widens_field():
+    symbol = "BAJAJ-AUTO-VERYLONGSYMBOLNAME"
+    quotes = RecordBuffer(QUOTE_DTYPE, 1, len(symbol))
+    quotes.append(symbol=symbol, price=1.0)
+    quotes.append(symbol="TCS", price=2.0)
+    assert quotes.column("symbol").tolist() == [symbol, "TCS"]
+
+
+def test_rank_sorts_nan_last():
+    quotes = RecordBuffer(QUOTE_DTYPE, 4)
+    for symbol, change in [("A", 1.0), ("B", np.nan), ("C", 3.0), ("D", -2.0)]:
+        quotes.append(symbol=symbol, pct_change=change)
+    gainers = quotes.to_frame(quotes.rank("pct_change", ascending=False))
+    assert gainers["symbol"].tolist() == ["C", "A", "D", "B"]
+
+
+def test_history_round_trip_keeps_long_symbols(tmp_path):
+    path = tmp_path / "price_history.npz"
+    history = {
+        "BAJAJ-AUTO-VERYLONGSYMBOLNAME": (np.array([1.0, 2.0, 3.0]), "2026-10-16"),
+        "TCS": (np.array([4.0]), "245:4.0000"),
+        "EMPTY": (np.array([]), "0"),
+    }
+    save_history(path, history)
+    loaded = load_history(path)
+
+    assert list(loaded) == list(history)
+    for symbol, (closes, last_date) in history.items():
+        np.testing.assert_array_equal(loaded[symbol][0], closes)
+        assert loaded[symbol][1] == last_date
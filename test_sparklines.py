@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import sparklines
+from sparklines import SPARK_POINTS, _downsample_index, _sma, sparklines_for
+
+
+def _closes(n: int = 245, seed: int = 3) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 100 * np.cumprod(1 + rng.normal(0, 0.02, n))
+
+
+@pytest.mark.parametrize("window", [50, 200])
+def test_sma_matches_pandas_rolling_mean(window):
+    closes = _closes()
+    expected = pd.Series(closes).rolling(window).mean().to_numpy()
+    np.testing.assert_allclose(_sma(closes, window), expected, rtol=1e-9, equal_nan=True)
+
+
+def test_sma_nan_only_blanks_windows_that_contain_it():
+    closes = _closes()
+    closes[100] = np.nan
+    expected = pd.Series(closes).rolling(50).mean().to_numpy()
+    got = _sma(closes, 50)
+    np.testing.assert_allclose(got, expected, rtol=1e-9, equal_nan=True)
+    assert not np.isnan(got[150:]).any()
+
+
+@pytest.mark.parametrize("n", [2, SPARK_POINTS, SPARK_POINTS + 1, 245, 5_000])
+def test_downsample_keeps_first_and_last_bar(n):
+    idx = _downsample_index(n, SPARK_POINTS)
+    assert idx[0] == 0
+    assert idx[-1] == n - 1
+    assert len(idx) <= SPARK_POINTS
+    assert (np.diff(idx) > 0).all()
+
+
+def test_sparkline_renders_all_three_lines():
+    svg = sparklines_for(["X"], {"X": (_closes(), "2026-10-16")})["X"]
+    for klass in ["spark-close", "spark-sma50", "spark-sma200"]:
+        assert f"class='{klass}'" in svg
+
+
+def test_cache_rerenders_only_when_last_date_changes(monkeypatch):
+    monkeypatch.setattr(sparklines, "_spark_cache", {})
+    calls = []
+    render = sparklines._render_sparkline
+    monkeypatch.setattr(
+        sparklines,
+        "_render_sparkline",
+        lambda symbol, closes: calls.append(symbol) or render(symbol, closes),
+    )
+
+    closes = _closes()
+    first = sparklines_for(["X"], {"X": (closes, "2026-10-15")})
+    again = sparklines_for(["X"], {"X": (closes, "2026-10-15")})
+    assert calls == ["X"]
+    assert again == first
+
+    sparklines_for(["X"], {"X": (np.append(closes, closes[-1] * 1.05), "2026-10-16")})
+    assert calls == ["X", "X"]